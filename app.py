@@ -3,15 +3,20 @@ Torrey Pines Waitlist Automation - Main Application
 """
 
 import os
+import atexit
+import queue
 import sqlite3
 import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from flask import Flask, Response, render_template, request
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
-from automation import run_waitlist_automation
+from apscheduler.jobstores.memory import MemoryJobStore
 import threading
-import pytz
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -22,61 +27,223 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+def json_response(obj, status=200):
+    """Build a JSON response, serialized with orjson"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
 # Database setup
 DATABASE = os.environ.get('DATABASE_PATH', 'jobs.db')
-PACIFIC_TZ = pytz.timezone('America/Los_Angeles')
+PACIFIC_TZ = ZoneInfo('America/Los_Angeles')
 
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+MAX_JOB_WORKERS = int(os.environ.get('MAX_JOB_WORKERS', 2))
+JOBS_PAGE_SIZE = 200
+MAX_JOBS_PAGE_SIZE = 1000
+
+# Column projections; status_rank and unused fields stay out of responses
+JOB_COLUMNS = '''
+    id, first_name, last_name, email, phone, course, players,
+    scheduled_time, status, result_message, created_at, completed_at
+'''
+JOB_LIST_COLUMNS = '''
+    id, first_name, last_name, course, players,
+    scheduled_time, status, result_message, created_at, completed_at
+'''
+AUTOMATION_COLUMNS = 'status, first_name, last_name, email, phone, course, players'
+
+# Dashboard sort order, stored as a generated column so it can be indexed
+STATUS_RANK_SQL = '''
+    CASE status
+        WHEN 'running' THEN 1
+        WHEN 'pending' THEN 2
+        WHEN 'completed' THEN 3
+        WHEN 'failed' THEN 4
+        ELSE 5
+    END
+'''
+
+_db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_writer_conn = None
+_writer_lock = threading.Lock()
+
+def _connect():
+    """Open a database connection with connection-scoped pragmas applied"""
+    # Autocommit mode; writes open their own transaction via transaction()
+    conn = sqlite3.connect(DATABASE, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    # journal_mode is persisted by init_db; these must be set per connection
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-20000')
     return conn
 
+@contextmanager
+def transaction(conn):
+    """Run a write transaction, taking the write lock up front"""
+    # IMMEDIATE locks before the first statement, so a concurrent writer waits
+    # on busy_timeout instead of failing the DEFERRED read-to-write upgrade
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+@contextmanager
+def get_db():
+    """Borrow a pooled database connection"""
+    try:
+        conn = _db_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _db_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+@contextmanager
+def get_writer():
+    """Borrow the single writer connection, serializing writes across threads"""
+    global _writer_conn
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = _connect()
+        try:
+            yield _writer_conn
+        finally:
+            if _writer_conn.in_transaction:
+                _writer_conn.rollback()
+
+@atexit.register
+def close_db():
+    """Close pooled and writer connections"""
+    while True:
+        try:
+            _db_pool.get_nowait().close()
+        except queue.Empty:
+            break
+    if _writer_conn is not None:
+        _writer_conn.close()
+
 def init_db():
     """Initialize the database"""
-    conn = get_db()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            course TEXT NOT NULL,
-            players INTEGER NOT NULL,
-            scheduled_time TEXT,
-            status TEXT DEFAULT 'pending',
-            result_message TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            completed_at TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        if DATABASE != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        
+        with transaction(conn):
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    first_name TEXT NOT NULL,
+                    last_name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    phone TEXT NOT NULL,
+                    course TEXT NOT NULL,
+                    players INTEGER NOT NULL,
+                    scheduled_time TEXT,
+                    status TEXT DEFAULT 'pending',
+                    result_message TEXT,
+                    created_at TEXT DEFAULT (datetime('now')),
+                    completed_at TEXT,
+                    status_rank INTEGER GENERATED ALWAYS AS ({STATUS_RANK_SQL}) VIRTUAL
+                )
+            ''')
+            
+            # Databases created before status_rank existed need it added
+            columns = [row['name'] for row in conn.execute('PRAGMA table_xinfo(jobs)')]
+            if 'status_rank' not in columns:
+                conn.execute(f'''
+                    ALTER TABLE jobs ADD COLUMN
+                    status_rank INTEGER GENERATED ALWAYS AS ({STATUS_RANK_SQL}) VIRTUAL
+                ''')
+            
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_created
+                ON jobs(status, created_at DESC)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_rank_created
+                ON jobs(status_rank, created_at DESC)
+            ''')
     logger.info("Database initialized")
 
-# Initialize scheduler
+def run_pragma(pragma):
+    """Run a maintenance PRAGMA, e.g. 'optimize' or 'wal_checkpoint(TRUNCATE)'"""
+    try:
+        with get_db() as conn:
+            conn.execute(f'PRAGMA {pragma}').fetchall()
+        logger.info(f"Ran PRAGMA {pragma}")
+    except sqlite3.Error as e:
+        logger.error(f"PRAGMA {pragma} failed: {e}")
+
+# Initialize scheduler. Schedules live in memory and are rebuilt from the
+# jobs table on startup, so the scheduler never competes for the db lock.
 jobstores = {
-    'default': SQLAlchemyJobStore(url=f'sqlite:///{DATABASE}')
+    'default': MemoryJobStore()
 }
 scheduler = BackgroundScheduler(jobstores=jobstores, timezone=PACIFIC_TZ)
 
-def run_job(job_id):
-    """Execute a waitlist automation job"""
-    logger.info(f"Running job {job_id}")
+def restore_scheduled_jobs():
+    """Re-register pending jobs whose scheduled time is still ahead"""
+    with get_db() as conn:
+        jobs = conn.execute('''
+            SELECT id, scheduled_time FROM jobs
+            WHERE status = 'pending' AND scheduled_time IS NOT NULL
+        ''').fetchall()
     
-    conn = get_db()
-    job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    
-    if not job:
-        logger.error(f"Job {job_id} not found")
-        return
+    now = datetime.now(PACIFIC_TZ)
+    restored = 0
     
-    # Update status to running
-    conn.execute('UPDATE jobs SET status = ? WHERE id = ?', ('running', job_id))
-    conn.commit()
+    for job in jobs:
+        try:
+            run_time = datetime.fromisoformat(job['scheduled_time']).replace(tzinfo=PACIFIC_TZ)
+        except ValueError as e:
+            logger.error(f"Skipping job {job['id']} with invalid schedule: {e}")
+            continue
+        
+        if run_time <= now:
+            continue
+        
+        scheduler.add_job(
+            submit_job,
+            'date',
+            run_date=run_time,
+            args=[job['id']],
+            id=f"job_{job['id']}",
+            replace_existing=True
+        )
+        restored += 1
     
+    logger.info(f"Restored {restored} scheduled jobs")
+
+# Jobs currently executing. The running state is only kept in memory so that
+# each job costs a single write (its final result) instead of two.
+RUNNING_JOBS = set()
+_running_lock = threading.Lock()
+
+def with_running_status(job):
+    """Convert a job row to a dict, overlaying the in-memory running state"""
+    job = dict(job)
+    if job['id'] in RUNNING_JOBS:
+        job['status'] = 'running'
+    return job
+
+def execute_automation(job_id, job):
+    """Run the browser automation for a job row, returning (status, message)"""
     try:
+        # Imported on first use so the web process starts without Selenium;
+        # an import failure is recorded on the job like any other error
+        from automation import run_waitlist_automation
+        
         result = run_waitlist_automation(
             first_name=job['first_name'],
             last_name=job['last_name'],
@@ -95,17 +262,57 @@ def run_job(job_id):
         status = 'failed'
         message = f"Error: {str(e)}"
     
-    # Update job with result
-    conn.execute('''
-        UPDATE jobs 
-        SET status = ?, result_message = ?, completed_at = ?
-        WHERE id = ?
-    ''', (status, message, datetime.now(PACIFIC_TZ).isoformat(), job_id))
-    conn.commit()
-    conn.close()
+    return status, message
+
+def run_job(job_id):
+    """Execute a waitlist automation job"""
+    logger.info(f"Running job {job_id}")
+    
+    with get_db() as conn:
+        job = conn.execute(f'SELECT {AUTOMATION_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    
+    if not job:
+        logger.error(f"Job {job_id} not found")
+        return
+    
+    if job['status'] != 'pending':
+        logger.warning(f"Job {job_id} is already {job['status']}")
+        return
+    
+    with _running_lock:
+        if job_id in RUNNING_JOBS:
+            logger.warning(f"Job {job_id} is already running")
+            return
+        RUNNING_JOBS.add(job_id)
+    
+    try:
+        status, message = execute_automation(job_id, job)
+        
+        # Update job with result
+        with get_writer() as conn, transaction(conn):
+            conn.execute('''
+                UPDATE jobs 
+                SET status = ?, result_message = ?, completed_at = datetime('now')
+                WHERE id = ?
+            ''', (status, message, job_id))
+    finally:
+        with _running_lock:
+            RUNNING_JOBS.discard(job_id)
     
     logger.info(f"Job {job_id} completed with status: {status}")
 
+# Bounded worker pool so bursts of jobs can't launch unlimited browsers
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_JOB_WORKERS, thread_name_prefix='job')
+atexit.register(JOB_EXECUTOR.shutdown, wait=False)
+
+def submit_job(job_id):
+    """Queue a job on the worker pool"""
+    def log_failure(future):
+        if future.exception():
+            logger.error(f"Job {job_id} worker crashed: {future.exception()}")
+    
+    JOB_EXECUTOR.submit(run_job, job_id).add_done_callback(log_failure)
+
 @app.route('/')
 def index():
     """Main page"""
@@ -113,22 +320,22 @@ def index():
 
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    """Get all jobs"""
-    conn = get_db()
-    jobs = conn.execute('''
-        SELECT * FROM jobs 
-        ORDER BY 
-            CASE status 
-                WHEN 'running' THEN 1 
-                WHEN 'pending' THEN 2 
-                WHEN 'completed' THEN 3 
-                WHEN 'failed' THEN 4 
-            END,
-            created_at DESC
-    ''').fetchall()
-    conn.close()
-    
-    return jsonify([dict(job) for job in jobs])
+    """Get a page of jobs, most relevant first"""
+    limit = max(1, min(request.args.get('limit', JOBS_PAGE_SIZE, type=int), MAX_JOBS_PAGE_SIZE))
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    with get_db() as conn:
+        jobs = conn.execute(f'''
+            SELECT {JOB_LIST_COLUMNS} FROM jobs 
+            ORDER BY status_rank, created_at DESC
+            LIMIT ? OFFSET ?
+        ''', (limit, offset)).fetchall()
+    
+    # Running jobs are still 'pending' in the database; float them to the top
+    jobs = [with_running_status(job) for job in jobs]
+    jobs.sort(key=lambda job: job['status'] != 'running')
+    
+    return json_response(jobs)
 
 @app.route('/api/jobs', methods=['POST'])
 def create_job():
@@ -139,45 +346,41 @@ def create_job():
     required = ['firstName', 'lastName', 'email', 'phone', 'course', 'players']
     for field in required:
         if not data.get(field):
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
-    conn = get_db()
+            return json_response({'error': f'Missing required field: {field}'}, 400)
     
     scheduled_time = data.get('scheduledTime')
     run_now = data.get('runNow', False)
     
-    cursor = conn.execute('''
-        INSERT INTO jobs (first_name, last_name, email, phone, course, players, scheduled_time, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data['firstName'],
-        data['lastName'],
-        data['email'],
-        data['phone'],
-        data['course'],
-        int(data['players']),
-        scheduled_time if not run_now else None,
-        'pending'
-    ))
-    
-    job_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with get_db() as conn, transaction(conn):
+        cursor = conn.execute('''
+            INSERT INTO jobs (first_name, last_name, email, phone, course, players, scheduled_time, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            data['phone'],
+            data['course'],
+            int(data['players']),
+            scheduled_time if not run_now else None,
+            'pending'
+        ))
+        
+        job_id = cursor.lastrowid
     
     if run_now:
-        # Run immediately in background thread
+        # Run immediately on the worker pool
         logger.info(f"Running job {job_id} immediately")
-        thread = threading.Thread(target=run_job, args=(job_id,))
-        thread.start()
+        submit_job(job_id)
     elif scheduled_time:
         # Schedule for later
         try:
             # Parse the scheduled time (expected format: "2024-01-15T04:30")
             run_time = datetime.fromisoformat(scheduled_time)
-            run_time = PACIFIC_TZ.localize(run_time)
+            run_time = run_time.replace(tzinfo=PACIFIC_TZ)
             
             scheduler.add_job(
-                run_job,
+                submit_job,
                 'date',
                 run_date=run_time,
                 args=[job_id],
@@ -187,35 +390,32 @@ def create_job():
             logger.info(f"Scheduled job {job_id} for {run_time}")
         except Exception as e:
             logger.error(f"Failed to schedule job {job_id}: {e}")
-            return jsonify({'error': f'Failed to schedule: {str(e)}'}), 500
+            return json_response({'error': f'Failed to schedule: {str(e)}'}, 500)
     
-    return jsonify({'id': job_id, 'status': 'created'})
+    return json_response({'id': job_id, 'status': 'created'})
 
 @app.route('/api/jobs/<int:job_id>', methods=['GET'])
 def get_job(job_id):
     """Get a specific job"""
-    conn = get_db()
-    job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    conn.close()
+    with get_db() as conn:
+        job = conn.execute(f'SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
     if not job:
-        return jsonify({'error': 'Job not found'}), 404
+        return json_response({'error': 'Job not found'}, 404)
     
-    return jsonify(dict(job))
+    return json_response(with_running_status(job))
 
 @app.route('/api/jobs/<int:job_id>', methods=['PUT'])
 def update_job(job_id):
     """Update a pending job"""
-    conn = get_db()
-    job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    with get_db() as conn:
+        job = conn.execute(f'SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
     if not job:
-        conn.close()
-        return jsonify({'error': 'Job not found'}), 404
+        return json_response({'error': 'Job not found'}, 404)
     
-    if job['status'] not in ['pending']:
-        conn.close()
-        return jsonify({'error': 'Can only edit pending jobs'}), 400
+    if job['status'] not in ['pending'] or job_id in RUNNING_JOBS:
+        return json_response({'error': 'Can only edit pending jobs'}, 400)
     
     data = request.json
     
@@ -225,31 +425,31 @@ def update_job(job_id):
     except:
         pass
     
-    conn.execute('''
-        UPDATE jobs 
-        SET first_name = ?, last_name = ?, email = ?, phone = ?, course = ?, players = ?, scheduled_time = ?
-        WHERE id = ?
-    ''', (
-        data.get('firstName', job['first_name']),
-        data.get('lastName', job['last_name']),
-        data.get('email', job['email']),
-        data.get('phone', job['phone']),
-        data.get('course', job['course']),
-        int(data.get('players', job['players'])),
-        data.get('scheduledTime', job['scheduled_time']),
-        job_id
-    ))
-    conn.commit()
+    with get_db() as conn, transaction(conn):
+        conn.execute('''
+            UPDATE jobs 
+            SET first_name = ?, last_name = ?, email = ?, phone = ?, course = ?, players = ?, scheduled_time = ?
+            WHERE id = ?
+        ''', (
+            data.get('firstName', job['first_name']),
+            data.get('lastName', job['last_name']),
+            data.get('email', job['email']),
+            data.get('phone', job['phone']),
+            data.get('course', job['course']),
+            int(data.get('players', job['players'])),
+            data.get('scheduledTime', job['scheduled_time']),
+            job_id
+        ))
     
     # Reschedule if needed
     scheduled_time = data.get('scheduledTime', job['scheduled_time'])
     if scheduled_time:
         try:
             run_time = datetime.fromisoformat(scheduled_time)
-            run_time = PACIFIC_TZ.localize(run_time)
+            run_time = run_time.replace(tzinfo=PACIFIC_TZ)
             
             scheduler.add_job(
-                run_job,
+                submit_job,
                 'date',
                 run_date=run_time,
                 args=[job_id],
@@ -259,18 +459,16 @@ def update_job(job_id):
         except Exception as e:
             logger.error(f"Failed to reschedule job {job_id}: {e}")
     
-    conn.close()
-    return jsonify({'status': 'updated'})
+    return json_response({'status': 'updated'})
 
 @app.route('/api/jobs/<int:job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """Delete a job"""
-    conn = get_db()
-    job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    with get_db() as conn:
+        job = conn.execute('SELECT id FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
     if not job:
-        conn.close()
-        return jsonify({'error': 'Job not found'}), 404
+        return json_response({'error': 'Job not found'}, 404)
     
     # Remove scheduled job if exists
     try:
@@ -278,27 +476,22 @@ def delete_job(job_id):
     except:
         pass
     
-    conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
-    conn.commit()
-    conn.close()
+    with get_db() as conn, transaction(conn):
+        conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
     
-    return jsonify({'status': 'deleted'})
+    return json_response({'status': 'deleted'})
 
 @app.route('/api/jobs/<int:job_id>/run', methods=['POST'])
 def run_job_now(job_id):
     """Run a pending job immediately"""
-    conn = get_db()
-    job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    with get_db() as conn:
+        job = conn.execute('SELECT id, status FROM jobs WHERE id = ?', (job_id,)).fetchone()
     
     if not job:
-        conn.close()
-        return jsonify({'error': 'Job not found'}), 404
+        return json_response({'error': 'Job not found'}, 404)
     
-    if job['status'] not in ['pending']:
-        conn.close()
-        return jsonify({'error': 'Can only run pending jobs'}), 400
-    
-    conn.close()
+    if job['status'] not in ['pending'] or job_id in RUNNING_JOBS:
+        return json_response({'error': 'Can only run pending jobs'}, 400)
     
     # Remove scheduled job if exists
     try:
@@ -306,24 +499,38 @@ def run_job_now(job_id):
     except:
         pass
     
-    # Run in background thread
-    thread = threading.Thread(target=run_job, args=(job_id,))
-    thread.start()
+    # Run on the worker pool
+    submit_job(job_id)
     
-    return jsonify({'status': 'started'})
+    return json_response({'status': 'started'})
+
+@lru_cache(maxsize=1)
+def format_server_time(minute):
+    """Format a minute-resolution time; cached since the page polls it"""
+    return (
+        minute.strftime('%Y-%m-%dT%H:%M'),
+        minute.strftime('%B %d, %Y at %I:%M %p PST')
+    )
 
 @app.route('/api/time')
 def get_server_time():
     """Get current server time in Pacific timezone"""
-    now = datetime.now(PACIFIC_TZ)
-    return jsonify({
-        'time': now.strftime('%Y-%m-%dT%H:%M'),
-        'display': now.strftime('%B %d, %Y at %I:%M %p PST')
-    })
+    now = datetime.now(PACIFIC_TZ).replace(second=0, microsecond=0)
+    time, display = format_server_time(now)
+    return json_response({'time': time, 'display': display})
 
 if __name__ == '__main__':
     init_db()
     scheduler.start()
+    restore_scheduled_jobs()
+    
+    # Keep planner statistics fresh and stop the WAL growing between bursts
+    scheduler.add_job(run_pragma, 'interval', minutes=15, args=['optimize'],
+                      id='pragma_optimize', replace_existing=True)
+    scheduler.add_job(run_pragma, 'interval', hours=1, args=['wal_checkpoint(TRUNCATE)'],
+                      id='pragma_wal_checkpoint', replace_existing=True)
+    # Registered after close_db so it runs before the pool is closed
+    atexit.register(run_pragma, 'optimize')
     
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
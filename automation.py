@@ -9,15 +9,34 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
+import base64
 import logging
 import traceback
 import os
+import re
+import tempfile
+import atexit
+import queue
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; pooled browsers use temporary profiles there
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', '/usr/local/bin/chromedriver')
+
+# Resolved once per process; see get_driver_path()
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
 LATITUDE = 32.8986
 LONGITUDE = -117.2431
 
@@ -31,9 +50,254 @@ COURSE_MAP = {
     "First Avail.": "First Avail."
 }
 
+WAITWHILE_ORIGIN = "https://waitwhile.com"
+# Everything Waitwhile can keep for a visitor besides cookies
+WAITWHILE_STORAGE_TYPES = "local_storage,indexeddb,service_workers,cache_storage,websql"
+
+# sessionStorage belongs to the tab, not the profile, and survives
+# navigating to about:blank, so it can only be cleared from the page
+CLEAR_SESSION_STORAGE_JS = """
+if (location.origin !== arguments[0]) return false;
+sessionStorage.clear();
+return true;
+"""
+
+# Optional JSON endpoint reporting whether the waitlist is open, and the
+# dotted key holding that flag (e.g. "waitlist.isOpen"). Without them the
+# probe inspects the welcome page HTML instead.
+WAITLIST_STATUS_URL = os.environ.get('WAITLIST_STATUS_URL')
+WAITLIST_OPEN_KEY = os.environ.get('WAITLIST_OPEN_KEY')
+
+# Resolves with the join button state ('ready', 'waiting' or 'unknown'),
+# read from the status endpoint's JSON or from freshly fetched page HTML
+JOIN_PROBE_JS = """
+const [url, openKey, done] = arguments;
+fetch(url, {cache: 'no-store', credentials: 'include'})
+    .then(r => openKey ? r.json().then(data => {
+        const open = openKey.split('.').reduce((o, k) => o == null ? undefined : o[k], data);
+        done(open === undefined ? 'unknown' : (open ? 'ready' : 'waiting'));
+    }) : r.text().then(html => {
+        const tag = html.match(/<button[^>]*wwpp-primary-button[^>]*>/);
+        done(tag ? (/\\sdisabled/.test(tag[0]) ? 'waiting' : 'ready') : 'unknown');
+    }))
+    .catch(() => done('unknown'));
+"""
+
+# Page text and URLs signalling the submission outcome. The text patterns
+# are only matched in-browser, where SUBMISSION_OBSERVER_JS compiles them
+# case-insensitively; the URL pattern is also checked here, so keep it to
+# syntax shared by Python and JS. The gaps are bounded so a miss can't
+# backtrack across the whole page.
+SUCCESS_TEXT_PATTERN = r"you(?:'?re| are) on the list|position[\s\S]{0,80}line"
+ERROR_TEXT_PATTERN = r"error[\s\S]{0,60}try again"
+SUCCESS_URL_RE = re.compile(r"confirmation|/status")
+
+# Resolves once the page shows a submission outcome (or after a timeout),
+# re-checking on every DOM mutation instead of polling page_source
+SUBMISSION_OBSERVER_JS = """
+const [originalUrl, timeoutMs, successPattern, errorPattern, successUrlPattern, done] = arguments;
+const successRe = new RegExp(successPattern, 'i');
+const errorRe = new RegExp(errorPattern, 'i');
+const successUrlRe = new RegExp(successUrlPattern);
+let finished = false;
+let observer, timer;
+
+function evaluate() {
+    const url = location.href;
+    const text = document.body ? document.body.innerText : '';
+    if (successRe.test(text) || successUrlRe.test(url)) {
+        return 'success';
+    }
+    if (url !== originalUrl && !url.includes('registration=waitlist')) {
+        return 'redirect';
+    }
+    if (errorRe.test(text)) {
+        return 'error';
+    }
+    return null;
+}
+
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    window.removeEventListener('popstate', onChange);
+    window.removeEventListener('hashchange', onChange);
+    const url = location.href;
+    done({result: result, url: url, original_matches: url.includes('registration=waitlist')});
+}
+
+function onChange() {
+    const result = evaluate();
+    if (result) finish(result);
+}
+
+observer = new MutationObserver(onChange);
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+window.addEventListener('popstate', onChange);
+window.addEventListener('hashchange', onChange);
+timer = setTimeout(() => finish(null), timeoutMs);
+onChange();
+"""
+
+WAIT_POLL_FREQUENCY = 0.2
+
+# Default limit for in-page async scripts (probes, settle waits)
+SCRIPT_TIMEOUT = 30
+
+# How long a run waits for the waitlist to open, whichever way it polls;
+# matches the old 120 refreshes of roughly 6s each
+JOIN_WAIT_TIMEOUT = 12 * 60
+
+# Resources the form filler never needs; blocked to cut bytes per page load
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.mp4",
+    "*.woff2", "*.woff", "*.ttf",
+    "*google-analytics*", "*googletagmanager*", "*facebook.net*",
+    "*segment.io*", "*sentry.io*", "*doubleclick.net*", "*.hotjar.com*",
+]
+
+# Locators. CSS selectors go through Blink's native matcher, which is
+# cheaper than chromedriver's XPath evaluation.
+JOIN_BUTTON = (By.CSS_SELECTOR, "button.wwpp-primary-button:not([disabled])")
+SUBMIT_BUTTON = (By.CSS_SELECTOR, "button[data-cy='form-button']")
+PAGE_BODY = (By.TAG_NAME, "body")
+
+FIRST_NAME_INPUT = "form_firstName"
+LAST_NAME_INPUT = "form_lastName"
+EMAIL_INPUT = "form_email"
+PHONE_INPUT = "form_phone"
+COURSE_SELECT_INPUT = "react-select-2-input"
+PLAYERS_SELECT_INPUT = "react-select-3-input"
+
+# Returns the join button if it is rendered and enabled, in one round trip
+FIND_JOIN_BUTTON_JS = """
+const button = document.querySelector(arguments[0]);
+return button && button.offsetParent !== null ? button : null;
+"""
+
+# Sets an input's value through the native setter so React's change
+# tracking notices it, then fires the events its listeners expect
+SET_INPUT_VALUE_JS = """
+const [el, value] = arguments;
+const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+setter.call(el, value);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return el.value;
+"""
+
+# Batch form of SET_INPUT_VALUE_JS over [id, value] pairs; returns the ids
+# that were missing or didn't keep their value
+BATCH_FILL_JS = """
+const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+const unfilled = [];
+for (const [id, value] of arguments[0]) {
+    const el = document.getElementById(id);
+    if (!el) {
+        unfilled.push(id);
+        continue;
+    }
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    if (!el.value) unfilled.push(id);
+}
+return unfilled;
+"""
+
+# Installed on every new document: counts DOM mutations so waits can tell
+# when the page has stopped changing
+MUTATION_COUNTER_JS = """
+window.__mutations = 0;
+new MutationObserver(() => { window.__mutations++; })
+    .observe(document, {subtree: true, childList: true, attributes: true});
+"""
+
+# Resolves true once no mutations have been counted for quietMs, or false
+# when timeoutMs passes first
+DOM_SETTLE_JS = """
+const [quietMs, timeoutMs, done] = arguments;
+const start = performance.now();
+let last = window.__mutations;
+let lastChange = start;
+(function check() {
+    const now = performance.now();
+    if (window.__mutations !== last) {
+        last = window.__mutations;
+        lastChange = now;
+    }
+    if (now - lastChange >= quietMs) return done(true);
+    if (now - start >= timeoutMs) return done(false);
+    setTimeout(check, 25);
+})();
+"""
+
+# True once a clicked submit button shows the form is on its way
+SUBMIT_STARTED_JS = """
+const [button, preSubmitUrl] = arguments;
+return !button.isConnected || button.disabled || location.href !== preSubmitUrl;
+"""
+
+# Installed before any page script runs so Waitwhile never sees the
+# automation markers, even on the first load
+STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+window.chrome = window.chrome || {};
+window.chrome.runtime = window.chrome.runtime || {};
+"""
+
+# Finds an open react-select option by its exact label in one round trip
+FIND_OPTION_JS = """
+return [...document.querySelectorAll("div[class*='option']")]
+    .find(e => e.textContent.trim() === arguments[0]) || null;
+"""
+
+# Types an option's label into a react-select input and presses Enter to
+# pick the first match; true if the control now shows that label
+TYPE_SELECT_OPTION_JS = """
+const [input, label] = arguments;
+const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+input.focus();
+setter.call(input, label);
+input.dispatchEvent(new Event('input', {bubbles: true}));
+input.dispatchEvent(new KeyboardEvent('keydown', {key: 'Enter', keyCode: 13, bubbles: true, cancelable: true}));
+const container = input.closest("[class*='container']");
+const value = container && container.querySelector("[class*='singleValue'], [class*='single-value']");
+return !!value && value.textContent.trim() === label;
+"""
+
+# Warm headless browsers kept between runs to skip Chrome startup
+BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', 3))
+BROWSER_ACQUIRE_TIMEOUT = 120
+
+# Each pool slot keeps its own Chrome profile so the HTTP cache survives
+# browser restarts; the disk cache is capped to keep profiles from growing
+USER_DATA_ROOT = os.environ.get('WAITLIST_PROFILES', os.path.join(tempfile.gettempdir(), 'waitlist-profiles'))
+PROFILE_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def get_driver_path():
+    global _driver_path
+    
+    # The lock makes concurrent cold starts share one resolution
+    with _driver_path_lock:
+        if _driver_path is None:
+            if os.path.exists(CHROMEDRIVER_PATH):
+                _driver_path = CHROMEDRIVER_PATH
+            else:
+                # Outside the Docker image; imported here to keep it off the import path
+                from webdriver_manager.chrome import ChromeDriverManager
+                _driver_path = ChromeDriverManager().install()
+            logger.info(f"Using chromedriver: {_driver_path}")
+        return _driver_path
 
-def create_driver(headless=True):
+
+def create_driver(headless=True, profile_dir=None):
     options = Options()
+    # get() returns at DOMContentLoaded; callers wait for the elements they need
+    options.page_load_strategy = 'eager'
     
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -45,24 +309,50 @@ def create_driver(headless=True):
     options.add_argument("--disable-sync")
     options.add_argument("--disable-translate")
     options.add_argument("--disable-default-apps")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-features=Translate,MediaRouter,OptimizationHints")
+    options.add_argument("--autoplay-policy=user-gesture-required")
+    options.add_argument("--mute-audio")
     options.add_argument("--no-first-run")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--blink-settings=imagesEnabled=false")
     options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
     
+    if profile_dir:
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={profile_dir}")
+            options.add_argument(f"--disk-cache-size={PROFILE_CACHE_BYTES}")
+        except OSError as e:
+            logger.warning(f"Could not use browser profile {profile_dir}, using a temporary one: {e}")
+    
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2
+    })
     
     if os.path.exists('/usr/bin/google-chrome'):
         options.binary_location = '/usr/bin/google-chrome'
     
-    service = Service('/usr/local/bin/chromedriver')
+    service = Service(get_driver_path())
     service.log_path = '/tmp/chromedriver.log'
     
     driver = webdriver.Chrome(service=service, options=options)
-    driver.set_script_timeout(30)
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    driver._wait_cache = {}
     
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+    except Exception as e:
+        logger.warning(f"Could not install automation overrides: {e}")
+    
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": MUTATION_COUNTER_JS})
+    except Exception as e:
+        logger.warning(f"Could not install mutation counter: {e}")
     
     try:
         driver.execute_cdp_cmd("Emulation.setGeolocationOverride", {
@@ -74,90 +364,379 @@ def create_driver(headless=True):
     except Exception as e:
         logger.warning(f"Could not set geolocation: {e}")
     
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logger.warning(f"Could not block page resources: {e}")
+    
     return driver
 
 
+# Warm headless browsers shared across automation runs. A semaphore bounds
+# how many exist at once; idle ones wait in a queue with state cleared.
+# Live browsers never outnumber slots, so each gets a free slot's profile.
+class BrowserPool:
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(size)
+        self._free_profiles = queue.Queue()
+        for slot_id in range(size):
+            self._free_profiles.put(slot_id)
+    
+    def acquire(self, timeout=None):
+        if not self._slots.acquire(timeout=timeout):
+            raise Exception(f"No browser available after {timeout}s")
+        
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._launch()
+                
+                if self._is_healthy(driver):
+                    return driver
+                
+                logger.warning("Discarding unresponsive pooled browser")
+                self._discard(driver)
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, driver):
+        try:
+            # The HTTP cache is kept on purpose; only per-user state goes.
+            # A run that ended off Waitwhile (e.g. on an error page) leaves
+            # its session storage out of reach, so that browser is dropped.
+            if not driver.execute_script(CLEAR_SESSION_STORAGE_JS, WAITWHILE_ORIGIN):
+                raise Exception("not on Waitwhile, session storage can't be cleared")
+            self._clear_site_data(driver)
+            driver.get("about:blank")
+            self._idle.put(driver)
+            logger.info("Browser returned to pool")
+        except Exception as e:
+            logger.warning(f"Could not return browser to pool: {e}")
+            self._discard(driver)
+        finally:
+            self._slots.release()
+    
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+    
+    def _launch(self):
+        slot_id = self._free_profiles.get_nowait()
+        profile_dir, profile_lock = self._lock_profile(slot_id)
+        try:
+            driver = create_driver(headless=True, profile_dir=profile_dir)
+        except BaseException:
+            if profile_lock:
+                profile_lock.close()
+            self._free_profiles.put(slot_id)
+            raise
+        driver._profile_slot = slot_id
+        driver._profile_lock = profile_lock
+        
+        try:
+            # A profile left by a browser that crashed or was restarted can
+            # still hold the previous person's cookies and storage
+            self._clear_site_data(driver)
+        except BaseException:
+            self._discard(driver)
+            raise
+        return driver
+    
+    @staticmethod
+    def _lock_profile(slot_id):
+        # Other processes on the host (gunicorn workers, a second instance)
+        # see the same slot directories, and Chrome won't share a profile;
+        # if the slot is locked elsewhere, run on a temporary profile
+        if fcntl is None:
+            return None, None
+        
+        profile_dir = os.path.join(USER_DATA_ROOT, f"slot-{slot_id}")
+        try:
+            os.makedirs(USER_DATA_ROOT, exist_ok=True)
+            lock = open(f"{profile_dir}.lock", 'w')
+        except OSError as e:
+            logger.warning(f"Could not use browser profile {profile_dir}, using a temporary one: {e}")
+            return None, None
+        
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            logger.info(f"Browser profile {profile_dir} is in use by another process, using a temporary one")
+            return None, None
+        return profile_dir, lock
+    
+    @staticmethod
+    def _clear_site_data(driver):
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+            "origin": WAITWHILE_ORIGIN,
+            "storageTypes": WAITWHILE_STORAGE_TYPES
+        })
+    
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.session_id is not None and driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+    
+    def _discard(self, driver):
+        try:
+            driver.quit()
+            logger.info("Browser closed")
+        except:
+            pass
+        # Chrome has exited, so the profile can be handed to a new browser
+        if driver._profile_lock:
+            driver._profile_lock.close()
+        self._free_profiles.put(driver._profile_slot)
+
+
+BROWSER_POOL = BrowserPool(BROWSER_POOL_SIZE)
+atexit.register(BROWSER_POOL.close)
+
+
+def get_wait(driver, timeout):
+    # WebDriverWait holds no per-call state, so keep one per timeout per driver
+    wait = driver._wait_cache.get(timeout)
+    if wait is None:
+        wait = WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY)
+        driver._wait_cache[timeout] = wait
+    return wait
+
+
 def wait_for_element(driver, by, value, timeout=10, clickable=False):
-    wait = WebDriverWait(driver, timeout)
+    wait = get_wait(driver, timeout)
     if clickable:
         return wait.until(EC.element_to_be_clickable((by, value)))
     return wait.until(EC.presence_of_element_located((by, value)))
 
 
+def wait_for_dom_settle(driver, quiet=0.1, timeout=2):
+    try:
+        return driver.execute_async_script(DOM_SETTLE_JS, int(quiet * 1000), int(timeout * 1000))
+    except WebDriverException:
+        return False
+
+
+def wait_for_submit_started(driver, submit_button, pre_submit_url, timeout=2):
+    def started(d):
+        try:
+            return d.execute_script(SUBMIT_STARTED_JS, submit_button, pre_submit_url)
+        except WebDriverException:
+            # Stale button or a navigation in progress; either way it went
+            return True
+    
+    try:
+        get_wait(driver, timeout).until(started)
+    except TimeoutException:
+        logger.warning("No sign of submission after clicking submit")
+
+
 def click_element(driver, element):
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-    time.sleep(0.2)
-    driver.execute_script("arguments[0].click();", element)
+    # scrollIntoView completes synchronously, so both fit in one round trip
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", element)
 
 
-def fill_input(driver, element_id, value):
+def fill_input(driver, element_id, value, require_keystrokes=False):
     element = wait_for_element(driver, By.ID, element_id, timeout=5)
-    element.clear()
-    element.send_keys(value)
+    
+    # One script call instead of a key event round trip per character;
+    # typing is kept for inputs that only react to real keystrokes
+    if require_keystrokes or not driver.execute_script(SET_INPUT_VALUE_JS, element, value):
+        element.clear()
+        element.send_keys(value)
+    
     logger.info(f"Filled {element_id}: {value}")
 
 
+def batch_fill_inputs(driver, values):
+    unfilled = driver.execute_script(BATCH_FILL_JS, list(values.items()))
+    
+    for element_id, value in values.items():
+        if element_id in unfilled:
+            fill_input(driver, element_id, value)
+        else:
+            logger.info(f"Filled {element_id}: {value}")
+
+
 def select_dropdown(driver, input_id, option_text):
     input_elem = wait_for_element(driver, By.ID, input_id, timeout=5, clickable=True)
+    
+    # One round trip when react-select accepts the typed label; otherwise
+    # open the menu and click the option
+    if driver.execute_script(TYPE_SELECT_OPTION_JS, input_elem, option_text):
+        logger.info(f"Selected dropdown option: {option_text}")
+        return
+    
+    logger.info(f"Typed selection not accepted, clicking option: {option_text}")
     click_element(driver, input_elem)
-    time.sleep(0.3)
     
-    option_xpath = f"//div[contains(@class, 'option') and text()='{option_text}']"
-    option = wait_for_element(driver, By.XPATH, option_xpath, timeout=5, clickable=True)
+    # Waiting for the option also waits for the menu to open
+    option = get_wait(driver, 5).until(
+        lambda d: d.execute_script(FIND_OPTION_JS, option_text),
+        f"Dropdown option not found: {option_text}"
+    )
     click_element(driver, option)
-    time.sleep(0.3)
+    
+    # The menu closes and the value re-renders once the selection is accepted
+    if not wait_for_dom_settle(driver):
+        logger.warning(f"Page still changing after selecting: {option_text}")
     
     logger.info(f"Selected dropdown option: {option_text}")
 
 
-def wait_for_join_button(driver, max_attempts=120, refresh_interval=2):
+def query_join_button(driver):
+    try:
+        return driver.execute_script(FIND_JOIN_BUTTON_JS, JOIN_BUTTON[1])
+    except WebDriverException:
+        # The document can be mid-reload
+        return None
+
+
+def find_join_button(driver, timeout=3):
+    try:
+        return get_wait(driver, timeout).until(query_join_button)
+    except TimeoutException:
+        return None
+
+
+def probe_join_button(driver):
+    # Fetch the waitlist state in-browser instead of reloading the page
+    if WAITLIST_STATUS_URL and WAITLIST_OPEN_KEY:
+        url, open_key = WAITLIST_STATUS_URL, WAITLIST_OPEN_KEY
+    else:
+        url, open_key = WELCOME_URL, None
+    
+    try:
+        return driver.execute_async_script(JOIN_PROBE_JS, url, open_key)
+    except Exception as e:
+        logger.debug(f"Join button probe failed: {e}")
+        return 'unknown'
+
+
+def wait_for_join_button(driver, timeout=JOIN_WAIT_TIMEOUT, refresh_interval=0.5,
+                         fallback_interval=2, max_probe_failures=3):
     logger.info("Waiting for 'Join waitlist' button...")
     
-    for attempt in range(max_attempts):
-        try:
-            button = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'wwpp-primary-button')]"))
-            )
-            logger.info(f"'Join waitlist' button found after {attempt + 1} attempts")
-            return button
-        except:
-            timestamp = datetime.now().strftime('%H:%M:%S')
-            logger.info(f"[{timestamp}] Button not ready, refreshing... (attempt {attempt + 1}/{max_attempts})")
+    button = find_join_button(driver)
+    if button:
+        logger.info("'Join waitlist' button found on first load")
+        return button
+    
+    # Bounded by time rather than attempts, since a probe poll and a
+    # fallback refresh take very different amounts of time
+    deadline = time.time() + timeout
+    probe_failures = 0
+    attempt = 0
+    
+    while time.time() < deadline:
+        attempt += 1
+        if probe_failures < max_probe_failures:
             time.sleep(refresh_interval)
-            driver.refresh()
+            state = probe_join_button(driver)
+            
+            if state == 'unknown':
+                probe_failures += 1
+                if probe_failures == max_probe_failures:
+                    logger.warning("Join button probe unavailable, falling back to page refreshes")
+            
+            if state != 'ready':
+                continue
+        else:
+            time.sleep(fallback_interval)
+        
+        # With the eager load strategy this returns once the new document
+        # is interactive, so the button query can't hit the old DOM
+        driver.refresh()
+        button = find_join_button(driver)
+        if button:
+            logger.info(f"'Join waitlist' button found after {attempt} attempts")
+            return button
+        
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        remaining = max(0, int(deadline - time.time()))
+        logger.info(f"[{timestamp}] Button not ready, refreshing... (attempt {attempt}, {remaining}s left)")
     
-    raise Exception(f"'Join waitlist' button not available after {max_attempts} attempts")
+    raise Exception(f"'Join waitlist' button not available after {timeout}s")
 
 
-def check_submission_result(driver, timeout=15):
-    start = time.time()
-    original_url = driver.current_url
+def check_submission_result(driver, timeout=15, original_url=None):
+    original_url = original_url or driver.current_url
+    deadline = time.time() + timeout
+    outcome = None
     
-    while time.time() - start < timeout:
+    # Pooled drivers outlive this run, so put the usual limit back after
+    driver.set_script_timeout(timeout + 1)
+    try:
+        while time.time() < deadline:
+            try:
+                outcome = driver.execute_async_script(
+                    SUBMISSION_OBSERVER_JS,
+                    original_url,
+                    int((deadline - time.time()) * 1000),
+                    SUCCESS_TEXT_PATTERN,
+                    ERROR_TEXT_PATTERN,
+                    SUCCESS_URL_RE.pattern
+                )
+                break
+            except WebDriverException as e:
+                # A full page navigation unloads the observer before it can
+                # report; re-arm it on the page we landed on
+                logger.info(f"Submission observer interrupted: {e.msg}")
+                time.sleep(0.5)
+    finally:
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
+    
+    # The observer reports where it finished; only ask the driver when
+    # every attempt was cut short by a navigation
+    if outcome is None:
+        result = None
         current_url = driver.current_url
-        page_text = driver.page_source.lower()
-        
-        if any([
-            "you're on the list" in page_text,
-            "you are on the list" in page_text,
-            "confirmation" in current_url,
-            "/status" in current_url,
-            "position" in page_text and "line" in page_text,
-        ]):
-            return True, f"Successfully joined waitlist! URL: {current_url}"
-        
-        if current_url != original_url and "registration=waitlist" not in current_url:
-            return True, f"Form submitted, redirected to: {current_url}"
-        
-        if "error" in page_text and "try again" in page_text:
-            return False, "Submission error detected on page"
-        
-        time.sleep(0.5)
+        on_registration_page = "registration=waitlist" in current_url
+    else:
+        result = outcome['result']
+        current_url = outcome['url']
+        on_registration_page = outcome['original_matches']
+    
+    if result == 'success' or SUCCESS_URL_RE.search(current_url):
+        return True, f"Successfully joined waitlist! URL: {current_url}"
+    
+    if result == 'error':
+        return False, "Submission error detected on page"
     
-    if "registration=waitlist" in driver.current_url:
+    if current_url != original_url and not on_registration_page:
+        return True, f"Form submitted, redirected to: {current_url}"
+    
+    if on_registration_page:
         return False, "Form did not submit - still on registration page"
     
-    return True, f"Submission completed. Final URL: {driver.current_url}"
+    return True, f"Submission completed. Final URL: {current_url}"
+
+
+def save_debug_screenshot(driver, prefix):
+    # A viewport JPEG is far cheaper to encode than save_screenshot's PNG,
+    # and writing it out happens off the request path
+    data = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": 60})["data"]
+    debug_path = f"/tmp/{prefix}_{int(time.time())}.jpg"
+    
+    def write():
+        with open(debug_path, 'wb') as f:
+            f.write(base64.b64decode(data))
+    
+    threading.Thread(target=write, daemon=True).start()
+    return debug_path
 
 
 def run_waitlist_automation(first_name, last_name, email, phone, course, players, headless=True):
@@ -175,42 +754,47 @@ def run_waitlist_automation(first_name, last_name, email, phone, course, players
     
     try:
         logger.info("[1/6] Starting browser...")
-        driver = create_driver(headless=headless)
-        logger.info("Browser started")
+        # Non-headless browsers (local debugging) are never pooled
+        if headless:
+            driver = BROWSER_POOL.acquire(timeout=BROWSER_ACQUIRE_TIMEOUT)
+        else:
+            driver = create_driver(headless=headless)
+        logger.info("Browser ready")
         
         logger.info("[2/6] Navigating to Torrey Pines waitlist...")
-        driver.get(WELCOME_URL)
-        wait_for_element(driver, By.TAG_NAME, "body", timeout=10)
-        logger.info(f"Page loaded: {driver.current_url}")
+        current_url = driver.current_url
+        if current_url.startswith(WELCOME_URL):
+            logger.info("Welcome page already loaded")
+        else:
+            driver.get(WELCOME_URL)
+            current_url = driver.current_url
+        wait_for_element(driver, *PAGE_BODY, timeout=10)
+        logger.info(f"Page loaded: {current_url}")
         
         logger.info("[3/6] Waiting for waitlist to open...")
-        join_button = wait_for_join_button(driver, max_attempts=120, refresh_interval=2)
+        join_button = wait_for_join_button(driver)
         click_element(driver, join_button)
         logger.info("Clicked 'Join waitlist' button")
-        time.sleep(1)
+        wait_for_element(driver, By.ID, FIRST_NAME_INPUT, timeout=10)
         
         logger.info("[4/6] Filling out form...")
-        fill_input(driver, "form_firstName", first_name)
-        fill_input(driver, "form_lastName", last_name)
-        fill_input(driver, "form_email", email)
-        fill_input(driver, "form_phone", phone)
+        batch_fill_inputs(driver, {
+            FIRST_NAME_INPUT: first_name,
+            LAST_NAME_INPUT: last_name,
+            EMAIL_INPUT: email,
+            PHONE_INPUT: phone
+        })
         logger.info("Form fields filled")
         
         logger.info("[5/6] Selecting course and players...")
         website_course = COURSE_MAP.get(course, course)
-        select_dropdown(driver, "react-select-2-input", website_course)
-        select_dropdown(driver, "react-select-3-input", str(players))
+        select_dropdown(driver, COURSE_SELECT_INPUT, website_course)
+        select_dropdown(driver, PLAYERS_SELECT_INPUT, str(players))
         logger.info("Dropdowns selected")
         
         logger.info("[6/6] Submitting form...")
         
-        submit_button = wait_for_element(
-            driver, 
-            By.CSS_SELECTOR, 
-            "button[data-cy='form-button']", 
-            timeout=5,
-            clickable=True
-        )
+        submit_button = wait_for_element(driver, *SUBMIT_BUTTON, timeout=5, clickable=True)
         
         if submit_button.get_attribute("disabled"):
             return {
@@ -222,17 +806,16 @@ def run_waitlist_automation(first_name, last_name, email, phone, course, players
         click_element(driver, submit_button)
         logger.info("Clicked submit button")
         
-        time.sleep(2)
+        wait_for_submit_started(driver, submit_button, pre_submit_url)
         
-        success, message = check_submission_result(driver, timeout=15)
+        success, message = check_submission_result(driver, timeout=15, original_url=pre_submit_url)
         
         if success:
             logger.info(f"SUCCESS: {message}")
             return {'status': 'success', 'message': message}
         else:
             try:
-                debug_path = f"/tmp/debug_{int(time.time())}.png"
-                driver.save_screenshot(debug_path)
+                debug_path = save_debug_screenshot(driver, "debug")
                 logger.error(f"Debug screenshot saved: {debug_path}")
             except:
                 pass
@@ -246,8 +829,7 @@ def run_waitlist_automation(first_name, last_name, email, phone, course, players
         
         if driver:
             try:
-                debug_path = f"/tmp/error_{int(time.time())}.png"
-                driver.save_screenshot(debug_path)
+                debug_path = save_debug_screenshot(driver, "error")
                 logger.error(f"Error screenshot saved: {debug_path}")
             except:
                 pass
@@ -255,7 +837,9 @@ def run_waitlist_automation(first_name, last_name, email, phone, course, players
         return {'status': 'error', 'message': error_msg}
     
     finally:
-        if driver:
+        if driver and headless:
+            BROWSER_POOL.release(driver)
+        elif driver:
             try:
                 driver.quit()
                 logger.info("Browser closed")
@@ -263,6 +847,17 @@ def run_waitlist_automation(first_name, last_name, email, phone, course, players
                 pass
 
 
+def run_waitlist_automation_batch(requests, pool_size=4):
+    # Each request is a dict of run_waitlist_automation keyword arguments.
+    # Workers spend their time blocked on chromedriver HTTP calls, so threads
+    # are enough; more workers than pooled browsers would only queue up.
+    workers = max(1, min(pool_size, BROWSER_POOL.size, len(requests)))
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='automation') as executor:
+        futures = [executor.submit(run_waitlist_automation, **request) for request in requests]
+        return [future.result() for future in futures]
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     